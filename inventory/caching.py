@@ -0,0 +1,59 @@
+"""Cache and session settings derived from the environment.
+
+Kept out of settings.py so the mapping can be tested on its own.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+CACHE_BACKENDS = {
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+}
+
+
+def cache_settings(url):
+    """CACHES for a CACHE_URL such as redis://host:6379/0 or memcached://host:11211.
+
+    An empty URL keeps Django's per-process LocMem cache.
+    """
+    if not url:
+        return {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    scheme, _, rest = url.partition('://')
+    if scheme not in CACHE_BACKENDS:
+        raise ImproperlyConfigured(f"Unsupported CACHE_URL scheme {scheme!r}")
+    location = url if scheme.startswith('redis') else rest
+    return {'default': {'BACKEND': CACHE_BACKENDS[scheme], 'LOCATION': location}}
+
+
+def session_engine(mode, shared_cache):
+    """SESSION_ENGINE for SESSION_MODE.
+
+    cached_db keeps each session in the cache for its whole lifetime, so with
+    a per-process cache a logout in one worker would not end the session in
+    the others; it needs a cache shared by every worker.
+    """
+    if mode not in SESSION_ENGINES:
+        raise ImproperlyConfigured(f"SESSION_MODE must be one of {', '.join(SESSION_ENGINES)}")
+    if mode == 'cached_db' and not shared_cache:
+        raise ImproperlyConfigured('SESSION_MODE=cached_db needs a shared cache; set CACHE_URL')
+    return SESSION_ENGINES[mode]
+
+
+def user_cache_seconds(seconds, shared_cache):
+    """USER_CACHE_SECONDS, which defaults to 0 (off) without a shared cache.
+
+    A per-process user cache would keep accepting a deactivated user, or a
+    session from before a password change, in every worker except the one
+    that saved the change.
+    """
+    if seconds is None:
+        return 30 if shared_cache else 0
+    if seconds > 0 and not shared_cache:
+        raise ImproperlyConfigured('USER_CACHE_SECONDS needs a shared cache; set CACHE_URL or use 0')
+    return seconds
@@ -14,6 +14,8 @@ from pathlib import Path
 import os
 from decouple import config
 
+from .caching import cache_settings, session_engine, user_cache_seconds
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -127,12 +129,49 @@ if (BASE_DIR / 'static').exists():
 else:
     STATICFILES_DIRS = []
 
-# WhiteNoise compression
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise compression (gzip, plus brotli when the Brotli package is installed).
+# STATICFILES_STORAGE was removed in Django 5.1, so the backend goes in STORAGES.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Fingerprinted files are served with a one-year "immutable" Cache-Control
+# by WhiteNoise; unhashed files (e.g. the service worker) get this max-age.
+WHITENOISE_MAX_AGE = 60 if DEBUG else 3600
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Optional cache shared by every worker (redis://... or memcached://...).
+# Without it each process has its own LocMem cache.
+CACHE_URL = config('CACHE_URL', default='')
+CACHES = cache_settings(CACHE_URL)
+
+# Session storage: "db" (Django default), "cached_db" (read from the shared
+# cache, written through to the DB; requires CACHE_URL) or "signed_cookies"
+# (no server-side storage).
+SESSION_MODE = config('SESSION_MODE', default='db')
+SESSION_ENGINE = session_engine(SESSION_MODE, shared_cache=bool(CACHE_URL))
+
+# The cached backend authenticates new logins; ModelBackend stays listed so
+# sessions created before it was added remain valid.
+AUTHENTICATION_BACKENDS = [
+    'store.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# How long (seconds) the logged-in User row is kept in the shared cache; 0
+# disables. Defaults to 30 with CACHE_URL and 0 without it.
+USER_CACHE_SECONDS = user_cache_seconds(
+    config('USER_CACHE_SECONDS', default=None, cast=lambda v: None if v in (None, '') else int(v)),
+    shared_cache=bool(CACHE_URL),
+)
+
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 LOGIN_URL = 'login'
@@ -150,3 +189,12 @@ if not DEBUG:
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Sales older than this many days are moved to the archive tables by
+# `python manage.py archive_sales`, keeping the hot Sales/SalesItem tables small.
+SALES_ARCHIVE_DAYS = config('SALES_ARCHIVE_DAYS', default=365, cast=int)
+
+# /dashboard/stream/ checks the database for sales saved by other workers at
+# most this often (seconds); sales saved by the same worker are pushed at once.
+# Under WSGI it is also the EventSource reconnect interval.
+DASHBOARD_STREAM_POLL_SECONDS = config('DASHBOARD_STREAM_POLL_SECONDS', default=5, cast=int)
@@ -0,0 +1,36 @@
+// Camera and image barcode scanning on top of the vendored html5-qrcode
+// build. Pages load both files on demand through loadScript().
+window.BarcodeScanner = (function () {
+    // 1D retail symbologies the shop's labels use
+    const FORMATS = ['EAN_13', 'EAN_8', 'UPC_A', 'UPC_E', 'CODE_128', 'CODE_39', 'CODABAR', 'ITF'];
+    let active = null;
+
+    function create(elementId) {
+        return new Html5Qrcode(elementId, {
+            formatsToSupport: FORMATS.map(function (f) { return Html5QrcodeSupportedFormats[f]; }),
+            experimentalFeatures: { useBarCodeDetectorIfSupported: true },
+            verbose: false
+        });
+    }
+
+    return {
+        // resolves once the camera streams; onCode is called for every read
+        start: function (elementId, deviceId, onCode) {
+            if (active) return Promise.resolve();
+            const scanner = create(elementId);
+            const camera = deviceId ? { deviceId: { exact: deviceId } } : { facingMode: 'environment' };
+            return scanner.start(camera, { fps: 12 }, function (text) { onCode(text); }, function () {})
+                .then(function () { active = scanner; });
+        },
+        stop: function () {
+            if (!active) return Promise.resolve();
+            const scanner = active;
+            active = null;
+            return scanner.stop().then(function () { scanner.clear(); });
+        },
+        // resolves with the barcode found in an image file, rejects when there is none
+        decodeFile: function (elementId, file) {
+            return create(elementId).scanFile(file, false);
+        }
+    };
+})();
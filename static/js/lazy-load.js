@@ -0,0 +1,21 @@
+// Load a script once, on demand. Resolves when it has executed; concurrent
+// callers share the same promise and a failed load can be retried.
+window.loadScript = (function () {
+    const pending = {};
+    return function (src) {
+        if (!pending[src]) {
+            pending[src] = new Promise(function (resolve, reject) {
+                const s = document.createElement('script');
+                s.src = src;
+                s.async = true;
+                s.onload = resolve;
+                s.onerror = function () {
+                    delete pending[src];
+                    reject(new Error('Failed to load ' + src));
+                };
+                document.head.appendChild(s);
+            });
+        }
+        return pending[src];
+    };
+})();
@@ -1,7 +1,11 @@
 from django.contrib import admin
-from .models import Category, Product, Sales, SalesItem
+from .models import Category, Product, StockLocation, ProductStock, Sales, SalesItem, ArchivedSales, ArchivedSalesItem
 
 admin.site.register(Category)
 admin.site.register(Product)
+admin.site.register(StockLocation)
+admin.site.register(ProductStock)
 admin.site.register(Sales)
 admin.site.register(SalesItem)
+admin.site.register(ArchivedSales)
+admin.site.register(ArchivedSalesItem)
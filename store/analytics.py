@@ -0,0 +1,124 @@
+import numpy as np
+from django.core.cache import cache
+
+from .models import Product, SalesItem, ArchivedSalesItem
+from .stock import total_stock_expression
+
+ANALYTICS_CACHE_TIMEOUT = 300  # seconds
+
+# cumulative revenue share boundaries for ABC classification
+ABC_A_SHARE = 0.80
+ABC_B_SHARE = 0.95
+
+
+# line items whose product was deleted (product_id NULL) are grouped under
+# this id so their revenue still counts; real primary keys start at 1
+DELETED_PRODUCT_ID = 0
+
+LINE_ITEM_DTYPE = np.dtype([('product_id', np.int64), ('quantity', np.int64), ('total', np.float64)])
+
+
+def _line_item_arrays(start=None, end=None):
+    # stream (product, quantity, total) tuples straight into a packed NumPy
+    # record array instead of materialising SalesItem model instances
+    chunks = []
+    for model in (SalesItem, ArchivedSalesItem):
+        qs = model.objects.all()
+        if start:
+            qs = qs.filter(sale__date_added__date__gte=start)
+        if end:
+            qs = qs.filter(sale__date_added__date__lte=end)
+        rows = qs.values_list('product_id', 'quantity', 'total').iterator(chunk_size=10000)
+        chunks.append(np.fromiter(
+            ((DELETED_PRODUCT_ID if pid is None else pid, qty, float(total)) for pid, qty, total in rows),
+            dtype=LINE_ITEM_DTYPE,
+        ))
+    items = np.concatenate(chunks)
+    return items['product_id'], items['quantity'], items['total']
+
+
+def aggregate_line_items(product_ids, quantities, totals):
+    """Group line items by product with a vectorized group-by.
+
+    Returns (unique product ids, units sold, revenue) as NumPy arrays.
+    """
+    if product_ids.size == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float64)
+    uniq, inverse = np.unique(product_ids, return_inverse=True)
+    units = np.bincount(inverse, weights=quantities, minlength=uniq.size).astype(np.int64)
+    revenue = np.bincount(inverse, weights=totals, minlength=uniq.size)
+    return uniq, units, revenue
+
+
+def classify_abc(revenue):
+    """Return an array of 'A'/'B'/'C' labels by cumulative revenue share."""
+    labels = np.full(revenue.size, 'C', dtype='<U1')
+    grand_total = revenue.sum()
+    if revenue.size == 0 or grand_total <= 0:
+        return labels
+    order = np.argsort(-revenue, kind='stable')
+    cumulative = np.cumsum(revenue[order])
+    # a product belongs to a class if the share *before* it is still under the
+    # boundary; shifting the cumulative sum avoids re-subtracting each share
+    prior = np.concatenate(([0.0], cumulative[:-1])) / grand_total
+    ranked = np.where(prior < ABC_A_SHARE, 'A', np.where(prior < ABC_B_SHARE, 'B', 'C'))
+    labels[order] = ranked
+    return labels
+
+
+def product_performance(start=None, end=None):
+    """Per-product units, revenue, gross margin, ABC class and sell-through.
+
+    `start`/`end` are datetime.date objects (or None). Results are cached
+    per date range for ANALYTICS_CACHE_TIMEOUT seconds.
+    """
+    cache_key = f"product_analytics:{start or 'all'}:{end or 'all'}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    uniq, units, revenue = aggregate_line_items(*_line_item_arrays(start, end))
+
+    products = {
+        pid: (name, barcode, cost, stock)
+        for pid, name, barcode, cost, stock in Product.objects.filter(id__in=uniq.tolist())
+        .annotate(stock_total=total_stock_expression())
+        .values_list('id', 'name', 'barcode', 'cost', 'stock_total')
+    }
+    # align current cost and stock with the aggregated product order
+    costs = np.array([float(products.get(pid, (None, None, 0, 0))[2]) for pid in uniq.tolist()], dtype=np.float64)
+    stock = np.array([products.get(pid, (None, None, 0, 0))[3] for pid in uniq.tolist()], dtype=np.int64)
+
+    cogs = units * costs
+    margin = revenue - cogs
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin_pct = np.where(revenue > 0, margin / revenue * 100, 0.0)
+        available = units + np.clip(stock, 0, None)
+        sell_through = np.where(available > 0, units / available * 100, 0.0)
+    abc = classify_abc(revenue)
+
+    rows = []
+    for i in np.argsort(-revenue, kind='stable').tolist():
+        pid = int(uniq[i])
+        name, barcode, _, _ = products.get(pid, ('Deleted product', '', 0, 0))
+        rows.append({
+            'id': pid if pid != DELETED_PRODUCT_ID else None,
+            'name': name,
+            'barcode': barcode,
+            'units': int(units[i]),
+            'revenue': round(float(revenue[i]), 2),
+            'gross_margin': round(float(margin[i]), 2),
+            'margin_pct': round(float(margin_pct[i]), 2),
+            'abc': str(abc[i]),
+            'sell_through': round(float(sell_through[i]), 2),
+        })
+
+    result = {
+        'products': rows,
+        'total_units': int(units.sum()),
+        'total_revenue': round(float(revenue.sum()), 2),
+        'total_margin': round(float(margin.sum()), 2),
+    }
+    cache.set(cache_key, result, ANALYTICS_CACHE_TIMEOUT)
+    return result
@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'store'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_save, post_delete
+        from .auth import invalidate_cached_user
+        from .catalog import invalidate_categories
+        from .models import Category, ProductStock
+        from .stock import invalidate_location_stock
+
+        User = get_user_model()
+        post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='store_invalidate_cached_user')
+        post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='store_invalidate_cached_user_delete')
+        post_save.connect(invalidate_categories, sender=Category, dispatch_uid='store_invalidate_categories')
+        post_delete.connect(invalidate_categories, sender=Category, dispatch_uid='store_invalidate_categories_delete')
+        post_save.connect(invalidate_location_stock, sender=ProductStock, dispatch_uid='store_invalidate_location_stock')
+        post_delete.connect(invalidate_location_stock, sender=ProductStock, dispatch_uid='store_invalidate_location_stock_delete')
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def _user_key(user_id):
+    return f"auth_user:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_user() skips the auth_user query on a cache hit.
+
+    AuthenticationMiddleware calls get_user() on every request; caching the
+    row for USER_CACHE_SECONDS saves one query per request. Entries live in
+    the default cache, which settings only allow when CACHE_URL makes it
+    shared, so saving or deleting a user is seen by every worker at once.
+    """
+
+    def get_user(self, user_id):
+        timeout = settings.USER_CACHE_SECONDS
+        if timeout <= 0:
+            return super().get_user(user_id)
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout)
+        return user
+
+
+def forget_cached_user(user_id):
+    cache.delete(_user_key(user_id))
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    forget_cached_user(instance.pk)
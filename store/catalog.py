@@ -0,0 +1,42 @@
+from django.core.cache import cache
+
+from .models import Category, Product
+
+# The default cache is per-process LocMem, so a signal only clears the copy in
+# the worker that handled the edit; keep the window other workers can serve a
+# stale list short.
+CATEGORY_CACHE_TIMEOUT = 30  # seconds
+CATEGORY_LIST_KEY = 'category_list'
+
+
+def product_by_barcode(barcode):
+    """Scan lookup; returns None for unknown barcodes.
+
+    Name, price and GST are read from the database on every scan (one query
+    on the unique barcode index) rather than cached, so a price edit made
+    through any worker shows up on the next scan everywhere. Stock is
+    served separately, see stock.total_stock().
+    """
+    entry = Product.objects.filter(barcode=barcode).values(
+        'id', 'barcode', 'name', 'price', 'gst_percentage').first()
+    if entry is None:
+        return None
+    return {
+        'id': entry['id'],
+        'barcode': entry['barcode'],
+        'name': entry['name'],
+        'price': float(entry['price']),
+        'gst': float(entry['gst_percentage']),
+    }
+
+
+def cached_categories():
+    categories = cache.get(CATEGORY_LIST_KEY)
+    if categories is None:
+        categories = list(Category.objects.all().order_by('name').values('id', 'name'))
+        cache.set(CATEGORY_LIST_KEY, categories, CATEGORY_CACHE_TIMEOUT)
+    return categories
+
+
+def invalidate_categories(sender, instance, **kwargs):
+    cache.delete(CATEGORY_LIST_KEY)
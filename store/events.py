@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Product, Sales
+from .stock import low_stock_count
+
+
+def dashboard_snapshot():
+    # same figures the dashboard view renders, in JSON-friendly form
+    today = timezone.now().date()
+    sales_today = Sales.objects.filter(date_added__date=today).aggregate(Sum('total_amount'))['total_amount__sum'] or 0
+    recent = list(Sales.objects.order_by('-date_added').values('id', 'transaction_id', 'total_amount', 'date_added')[:5])
+    return {
+        'total_products': Product.objects.count(),
+        'sales_today': str(sales_today),
+        'low_stock': low_stock_count(),
+        'recent_sales_html': render_to_string('dashboard_recent_sales.html', {'recent_sales': recent}),
+        'last_sale_id': max((s['id'] for s in recent), default=0),
+    }
+
+
+async def _run_db(fn, *args):
+    # short DB work on the default executor; pool threads never see
+    # request_finished, so close the connection they opened here
+    def run():
+        try:
+            return fn(*args)
+        finally:
+            connections.close_all()
+    return await sync_to_async(run, thread_sensitive=False)()
+
+
+class DashboardBroker:
+    """In-process pub/sub for dashboard snapshots.
+
+    save_sale publishes into the broker of the worker that handled it, and
+    every open stream in that worker wakes up with the same snapshot. Open
+    streams wait on an asyncio.Event that publish() sets from whichever
+    thread it runs in, so an idle dashboard holds no thread. Sales handled
+    by other workers are picked up by a rate-limited DB poll, which only
+    one waiting stream per process performs, so N open dashboards cost one
+    producer rather than N pollers.
+    """
+
+    def __init__(self, poll_interval):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot = None
+        self._subscribers = 0
+        self._waiters = set()
+        self._last_poll = 0.0
+
+    def publish(self):
+        with self._lock:
+            listening = bool(self._subscribers)
+        # nobody is listening; build lazily on the next subscribe
+        snapshot = dashboard_snapshot() if listening else None
+        with self._lock:
+            self._snapshot = snapshot
+            self._version += 1
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # that stream's event loop has already shut down
+                pass
+
+    def prime(self):
+        # build the snapshot ahead of the first subscriber (worker warm-up)
+        snapshot = dashboard_snapshot()
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def current(self):
+        """Latest snapshot without subscribing, for one-shot (WSGI) responses.
+
+        Runs the same rate-limited DB poll as wait(), so N reconnecting
+        dashboards still cost one query per poll interval per process.
+        """
+        self._poll()
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.prime()
+        return snapshot
+
+    async def subscribe(self):
+        with self._lock:
+            self._subscribers += 1
+            snapshot, version = self._snapshot, self._version
+        if snapshot is None:
+            try:
+                snapshot = await _run_db(dashboard_snapshot)
+            except BaseException:
+                self.unsubscribe()
+                raise
+            with self._lock:
+                if self._version == version:
+                    self._snapshot = snapshot
+        return version, snapshot
+
+    def unsubscribe(self):
+        with self._lock:
+            self._subscribers -= 1
+
+    async def wait(self, version, timeout):
+        """Wait until a newer snapshot than `version` exists or `timeout` passes.
+
+        Returns (version, snapshot), where snapshot is None on timeout. Only
+        the DB poll, when it is due, leaves the event loop.
+        """
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            current = self._version == version
+            if current:
+                self._waiters.add(waiter)
+        if current:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._lock:
+                    self._waiters.discard(waiter)
+        if self._poll_due():
+            await _run_db(self._poll)
+        with self._lock:
+            if self._version != version:
+                return self._version, self._snapshot
+        return version, None
+
+    def _poll_due(self):
+        with self._lock:
+            return time.monotonic() - self._last_poll >= self.poll_interval
+
+    def _poll(self):
+        # DB fallback for sales saved by other worker processes
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_poll < self.poll_interval:
+                return
+            self._last_poll = now
+            known = self._snapshot['last_sale_id'] if self._snapshot else None
+        latest = Sales.objects.order_by('-date_added').values_list('id', flat=True).first() or 0
+        if latest != known:
+            self.publish()
+
+
+dashboard_broker = DashboardBroker(settings.DASHBOARD_STREAM_POLL_SECONDS)
+
+
+def format_event(snapshot, retry=None):
+    # `retry` (seconds) tells EventSource how long to wait before reconnecting
+    prefix = f"retry: {int(retry * 1000)}\n" if retry else ''
+    return f"{prefix}event: dashboard\ndata: {json.dumps(snapshot)}\n\n"
@@ -0,0 +1,71 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from store.models import Sales, SalesItem, ArchivedSales, ArchivedSalesItem
+
+
+class Command(BaseCommand):
+    help = 'Move sales older than the archive horizon into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SALES_ARCHIVE_DAYS,
+                            help='Archive sales older than this many days (default: SALES_ARCHIVE_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of sales moved per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many sales would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        batch_size = max(1, options['batch_size'])
+        old_sales = Sales.objects.filter(date_added__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"{old_sales.count()} sales older than {cutoff:%Y-%m-%d} would be archived")
+            return
+
+        moved = 0
+        while True:
+            with transaction.atomic():
+                # lock the batch so a concurrent run cannot archive it twice
+                batch = list(old_sales.select_for_update().order_by('id')[:batch_size])
+                if not batch:
+                    break
+                sale_ids = [s.id for s in batch]
+                archived = ArchivedSales.objects.bulk_create([
+                    ArchivedSales(
+                        transaction_id=s.transaction_id,
+                        date_added=s.date_added,
+                        customer_name=s.customer_name,
+                        total_amount=s.total_amount,
+                        user_id=s.user_id,
+                        location_id=s.location_id,
+                    )
+                    for s in batch
+                ])
+                # bulk_create does not return pks on every backend, so map by transaction id
+                archive_ids = dict(
+                    ArchivedSales.objects.filter(transaction_id__in=[a.transaction_id for a in archived])
+                    .values_list('transaction_id', 'id')
+                )
+                txn_by_sale = {s.id: s.transaction_id for s in batch}
+                ArchivedSalesItem.objects.bulk_create([
+                    ArchivedSalesItem(
+                        sale_id=archive_ids[txn_by_sale[item.sale_id]],
+                        product_id=item.product_id,
+                        quantity=item.quantity,
+                        price=item.price,
+                        total=item.total,
+                    )
+                    for item in SalesItem.objects.filter(sale_id__in=sale_ids)
+                ])
+                SalesItem.objects.filter(sale_id__in=sale_ids).delete()
+                Sales.objects.filter(id__in=sale_ids).delete()
+            moved += len(batch)
+            self.stdout.write(f"Archived {moved} sales...")
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} sales older than {cutoff:%Y-%m-%d}"))
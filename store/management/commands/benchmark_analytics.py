@@ -0,0 +1,99 @@
+import time
+import tracemalloc
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from store.analytics import _line_item_arrays, product_performance
+from store.models import Product, Sales, SalesItem
+
+ITEMS_PER_SALE = 5
+
+
+class Command(BaseCommand):
+    help = 'Benchmark product analytics end to end on a seeded (rolled back) database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Number of seeded line items')
+        parser.add_argument('--products', type=int, default=5_000, help='Number of seeded products')
+        parser.add_argument('--sample', type=int, default=100_000,
+                            help='Line items aggregated through model instances for comparison')
+
+    def handle(self, *args, **options):
+        rows, n_products, sample = options['rows'], options['products'], options['sample']
+        with transaction.atomic():
+            self._seed(rows, n_products)
+
+            # end-to-end: values_list().iterator() -> np.fromiter -> group-by -> report
+            cache.clear()
+            started = time.perf_counter()
+            report = product_performance()
+            total_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            _line_item_arrays()
+            load_time = time.perf_counter() - started
+
+            # tracing slows Python down, so memory is measured in a separate pass
+            cache.clear()
+            tracemalloc.start()
+            product_performance()
+            _, numpy_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            orm_time, orm_peak = self._model_instances(sample)
+
+            transaction.set_rollback(True)
+        cache.clear()
+
+        scale = rows / sample
+        self.stdout.write(f"Line items:            {rows:,} across {len(report['products']):,} products")
+        self.stdout.write(f"product_performance(): {total_time:.2f}s (row-to-array load {load_time:.2f}s)")
+        self.stdout.write(f"  peak memory:         {numpy_peak / 1024 ** 2:,.1f} MiB")
+        self.stdout.write(f"Model instances:       ~{orm_time * scale:.2f}s, ~{orm_peak * scale / 1024 ** 2:,.1f} MiB "
+                          f"(extrapolated from {sample:,} rows)")
+
+    def _seed(self, rows, n_products):
+        self.stdout.write(f"Seeding {rows:,} line items...")
+        rng = np.random.default_rng(0)
+        products = Product.objects.bulk_create([
+            Product(barcode=f'BENCH-{i}', name=f'Bench {i}', price=10, cost=6, stock_quantity=100)
+            for i in range(n_products)
+        ], batch_size=1000)
+        product_ids = [p.pk for p in products] if products[0].pk else list(
+            Product.objects.filter(barcode__startswith='BENCH-').values_list('id', flat=True))
+        n_sales = -(-rows // ITEMS_PER_SALE)
+        Sales.objects.bulk_create([Sales(transaction_id=f'BENCH-{i}', total_amount=0) for i in range(n_sales)],
+                                  batch_size=5000)
+        sale_ids = list(Sales.objects.filter(transaction_id__startswith='BENCH-').values_list('id', flat=True))
+        picks = rng.integers(0, len(product_ids), size=rows)
+        quantities = rng.integers(1, 10, size=rows)
+        batch = []
+        for i in range(rows):
+            qty = int(quantities[i])
+            batch.append(SalesItem(sale_id=sale_ids[i // ITEMS_PER_SALE], product_id=product_ids[picks[i]],
+                                   quantity=qty, price=10, total=10 * qty))
+            if len(batch) == 10000:
+                SalesItem.objects.bulk_create(batch)
+                batch = []
+        SalesItem.objects.bulk_create(batch)
+
+    def _model_instances(self, sample):
+        # the naive approach: iterate SalesItem instances and sum in Python
+        def aggregate():
+            units, revenue = {}, {}
+            for item in SalesItem.objects.all()[:sample]:
+                units[item.product_id] = units.get(item.product_id, 0) + item.quantity
+                revenue[item.product_id] = revenue.get(item.product_id, 0) + item.total
+            return units, revenue
+
+        started = time.perf_counter()
+        aggregate()
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        aggregate()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak
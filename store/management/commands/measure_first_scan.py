@@ -0,0 +1,95 @@
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from store.models import Product
+
+# (label, GUNICORN_PRELOAD, WARMUP_ON_START) as read by gunicorn.conf.py
+MODES = [
+    ('no preload', 'false', 'false'),
+    ('preload', 'true', 'false'),
+    ('preload + warm-up', 'true', 'true'),
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = 'Measure time from starting gunicorn to the first successful scan, with and without preload/warm-up'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barcode', help='Barcode to look up (default: first product)')
+        parser.add_argument('--runs', type=int, default=3, help='Server starts per mode')
+        parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for the first scan')
+
+    def handle(self, *args, **options):
+        barcode = options['barcode'] or Product.objects.values_list('barcode', flat=True).first()
+        if barcode is None:
+            raise CommandError('No product to scan')
+        user = get_user_model().objects.first()
+        if user is None:
+            raise CommandError('No user to log in as')
+
+        # a real session the server processes can read, removed again afterwards
+        client = Client()
+        client.force_login(user)
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        path = f"{reverse('get_product')}?{urlencode({'barcode': barcode})}"
+        try:
+            for label, preload, warmup in MODES:
+                env = dict(os.environ, GUNICORN_PRELOAD=preload, WARMUP_ON_START=warmup,
+                           DEBUG='True')
+                times = [self._first_scan(env, path, cookie, options['timeout']) for _ in range(options['runs'])]
+                self.stdout.write(f"{label}: first scan {min(times) * 1000:.0f} ms after spawn "
+                                  f"(best of {len(times)}, median {sorted(times)[len(times) // 2] * 1000:.0f} ms)")
+        finally:
+            client.logout()
+
+    def _first_scan(self, env, path, cookie, timeout):
+        """Seconds from spawning gunicorn until it answers a scan successfully."""
+        port = _free_port()
+        started = time.perf_counter()
+        # DEBUG keeps SECURE_SSL_REDIRECT off for the plain-HTTP probe
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'inventory.wsgi', '--bind', f'127.0.0.1:{port}'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                if proc.poll() is not None:
+                    raise CommandError(f'gunicorn exited with status {proc.returncode} before serving a scan')
+                if time.perf_counter() - started > timeout:
+                    raise CommandError(f'No successful scan within {timeout:.0f}s')
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+                try:
+                    conn.request('GET', path, headers={'Cookie': cookie})
+                    resp = conn.getresponse()
+                    body = resp.read()
+                except OSError:
+                    # not listening yet
+                    time.sleep(0.002)
+                    continue
+                finally:
+                    conn.close()
+                elapsed = time.perf_counter() - started
+                if resp.status != 200 or not json.loads(body).get('success'):
+                    raise CommandError(f'Scan failed with HTTP {resp.status}')
+                return elapsed
+        finally:
+            proc.terminate()
+            proc.wait()
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from inventory.caching import SESSION_ENGINES
+from store.auth import forget_cached_user
+from store.models import Product
+
+# (label, session mode, user cache seconds)
+SCENARIOS = [
+    ('db sessions, no user cache', 'db', 0),
+    ('cached_db sessions + user cache', 'cached_db', 30),
+    ('signed_cookies sessions + user cache', 'signed_cookies', 30),
+]
+
+
+class Command(BaseCommand):
+    help = 'Count SQL queries per barcode scan (get_product) for each session mode'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barcode', help='Barcode to look up (default: first product)')
+        parser.add_argument('--username', help='User to log in as (default: first user)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user = User.objects.filter(username=options['username']).first() if options['username'] else User.objects.first()
+        if user is None:
+            raise CommandError('No user to log in as')
+        barcode = options['barcode'] or Product.objects.values_list('barcode', flat=True).first()
+        if barcode is None:
+            raise CommandError('No product to scan')
+        url = reverse('get_product')
+
+        for label, mode, user_cache_seconds in SCENARIOS:
+            with transaction.atomic():
+                with override_settings(SESSION_ENGINE=SESSION_ENGINES[mode], USER_CACHE_SECONDS=user_cache_seconds,
+                                       ALLOWED_HOSTS=['*'], SECURE_SSL_REDIRECT=False):
+                    forget_cached_user(user.pk)
+                    client = Client()
+                    client.force_login(user)
+                    # first scan warms the session and user caches
+                    client.get(url, {'barcode': barcode})
+                    with CaptureQueriesContext(connection) as ctx:
+                        resp = client.get(url, {'barcode': barcode})
+                # leave no session rows behind
+                transaction.set_rollback(True)
+            status = 'ok' if resp.status_code == 200 and resp.json().get('success') else f'HTTP {resp.status_code}'
+            self.stdout.write(f"{label}: {len(ctx.captured_queries)} queries per scan ({status})")
+        forget_cached_user(user.pk)
@@ -0,0 +1,42 @@
+import re
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Pinned front-end libraries served from static/vendor/ instead of public CDNs.
+# The files are committed; this command is only for bumping or re-fetching a
+# pin, and is not part of the build.
+VENDOR_ASSETS = {
+    'vendor/html5-qrcode/html5-qrcode-2.3.8.min.js': 'https://unpkg.com/html5-qrcode@2.3.8/html5-qrcode.min.js',
+    'vendor/chartjs/chart-4.4.0.umd.js': 'https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.js',
+    'vendor/jquery/jquery-3.7.1.min.js': 'https://code.jquery.com/jquery-3.7.1.min.js',
+    'vendor/bootstrap/bootstrap-5.3.8.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.8/dist/css/bootstrap.min.css',
+    'vendor/bootstrap/bootstrap-5.3.8.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.8/dist/js/bootstrap.bundle.min.js',
+}
+
+# The .map files are not vendored; a dangling reference would make
+# ManifestStaticFilesStorage fail during collectstatic.
+SOURCE_MAP_RE = re.compile(rb'(//[#@] sourceMappingURL=[^\s]*|/\*[#@] sourceMappingURL=[^*]*\*/)')
+
+
+class Command(BaseCommand):
+    help = 'Download the pinned front-end libraries into static/vendor/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-download files that already exist')
+
+    def handle(self, *args, **options):
+        static_dir = settings.BASE_DIR / 'static'
+        for rel_path, url in VENDOR_ASSETS.items():
+            target = static_dir / rel_path
+            if target.exists() and not options['force']:
+                self.stdout.write(f"{rel_path} already present")
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                with urllib.request.urlopen(url, timeout=30) as resp:
+                    target.write_bytes(SOURCE_MAP_RE.sub(b'', resp.read()))
+            except OSError as e:
+                raise CommandError(f"Could not download {url}: {e}")
+            self.stdout.write(self.style.SUCCESS(f"Downloaded {rel_path}"))
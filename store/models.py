@@ -23,12 +23,31 @@ class Product(models.Model):
     def __str__(self):
         return f"{self.name} ({self.barcode})"
 
+class StockLocation(models.Model):
+    # A store or counter that owns its own stock rows
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+class ProductStock(models.Model):
+    product = models.ForeignKey(Product, related_name='stocks', on_delete=models.CASCADE)
+    location = models.ForeignKey(StockLocation, related_name='stocks', on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.product.name} @ {self.location.name}: {self.quantity}"
+
+    class Meta:
+        unique_together = ('product', 'location')
+
 class Sales(models.Model):
     transaction_id = models.CharField(max_length=100, unique=True)
     date_added = models.DateTimeField(auto_now_add=True)
     customer_name = models.CharField(max_length=100, null=True, blank=True)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    location = models.ForeignKey(StockLocation, on_delete=models.SET_NULL, null=True, blank=True)
 
     def __str__(self):
         return self.transaction_id
@@ -49,3 +68,30 @@ class SalesItem(models.Model):
 
     def __str__(self):
         return f"{self.product.name} - {self.quantity}"
+
+
+class ArchivedSales(models.Model):
+    # Cold copy of Sales rows moved out by the archive_sales command
+    transaction_id = models.CharField(max_length=100, unique=True)
+    date_added = models.DateTimeField(db_index=True)
+    customer_name = models.CharField(max_length=100, null=True, blank=True)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    location = models.ForeignKey(StockLocation, on_delete=models.SET_NULL, null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.transaction_id
+
+    class Meta:
+        verbose_name_plural = "Archived sales"
+
+class ArchivedSalesItem(models.Model):
+    sale = models.ForeignKey(ArchivedSales, related_name='items', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True)
+    quantity = models.IntegerField(default=1)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    total = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.product.name if self.product else '-'} - {self.quantity}"
@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Product, ProductStock
+
+STOCK_CACHE_TIMEOUT = 60  # seconds
+LOW_STOCK_THRESHOLD = 10
+
+
+def _total_stock_key(product_id):
+    return f"product_total_stock:{product_id}"
+
+
+def total_stock(product_id):
+    """Stock across all locations, served from the cache.
+
+    Products without per-location rows fall back to Product.stock_quantity.
+    """
+    key = _total_stock_key(product_id)
+    total = cache.get(key)
+    if total is None:
+        total = ProductStock.objects.filter(product_id=product_id).aggregate(Sum('quantity'))['quantity__sum']
+        if total is None:
+            total = Product.objects.filter(pk=product_id).values_list('stock_quantity', flat=True).first() or 0
+        cache.set(key, total, STOCK_CACHE_TIMEOUT)
+    return total
+
+
+def prime_total_stock():
+    totals = dict(Product.objects.values_list('id', 'stock_quantity'))
+    totals.update(ProductStock.objects.values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total'))
+    cache.set_many({_total_stock_key(pid): total for pid, total in totals.items()}, STOCK_CACHE_TIMEOUT)
+    return len(totals)
+
+
+def location_stock(product_id, location_id):
+    """Stock sellable at one location.
+
+    Products that are not stocked per location sell from
+    Product.stock_quantity at every counter.
+    """
+    rows = dict(ProductStock.objects.filter(product_id=product_id).values_list('location_id', 'quantity'))
+    if not rows:
+        return Product.objects.filter(pk=product_id).values_list('stock_quantity', flat=True).first() or 0
+    return rows.get(location_id, 0)
+
+
+def total_stock_expression():
+    """Annotation with the same per-product total as total_stock()."""
+    return Coalesce(Sum('stocks__quantity'), 'stock_quantity')
+
+
+def low_stock_count():
+    return Product.objects.annotate(total=total_stock_expression()).filter(total__lt=LOW_STOCK_THRESHOLD).count()
+
+
+def invalidate_total_stock(product_ids):
+    cache.delete_many([_total_stock_key(pid) for pid in product_ids])
+
+
+def invalidate_location_stock(sender, instance, **kwargs):
+    # ProductStock edited outside save_sale (admin, shell, imports)
+    invalidate_total_stock([instance.product_id])
+
+
+class LocationRequired(ValueError):
+    """A per-location product was sold without saying which location."""
+
+
+def decrement_stock(product, quantity, location_id=None):
+    """Atomically take `quantity` units of `product` out of stock.
+
+    With a location only that location's ProductStock row is touched, so
+    checkouts at different counters never update the same row. Products
+    without any ProductStock rows use the legacy Product.stock_quantity
+    column at every counter. Returns False when there is not enough stock
+    and raises LocationRequired when a per-location product is sold
+    without a location.
+    """
+    if location_id:
+        updated = ProductStock.objects.filter(
+            product_id=product.pk, location_id=location_id, quantity__gte=quantity
+        ).update(quantity=F('quantity') - quantity)
+        if updated:
+            return True
+    if ProductStock.objects.filter(product_id=product.pk).exists():
+        if not location_id:
+            raise LocationRequired(f'Select a stock location to sell {product.name}')
+        return False
+    updated = Product.objects.filter(
+        pk=product.pk, stock_quantity__gte=quantity
+    ).update(stock_quantity=F('stock_quantity') - quantity)
+    return updated == 1
@@ -1,3 +1,488 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+import re
+from io import StringIO
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.template import engines
+from django.templatetags.static import static
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.caching import cache_settings, session_engine, user_cache_seconds
+
+from .analytics import aggregate_line_items, classify_abc, product_performance
+from .auth import CachedModelBackend
+from .catalog import cached_categories
+from .events import dashboard_broker
+from .models import Category, Product, Sales, SalesItem, ArchivedSales, ArchivedSalesItem, StockLocation, ProductStock
+from .stock import low_stock_count, total_stock
+from .warmup import WARM_TEMPLATES, warm_up
+
+# pages render {% static %} without a collected manifest under test
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=TEST_STORAGES, SALES_ARCHIVE_DAYS=365)
+class SalesArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cashier', password='secret')
+        self.client.force_login(self.user)
+        self.product = Product.objects.create(barcode='111', name='Pen', price=10, cost=6, stock_quantity=100)
+
+    def make_sale(self, transaction_id, days_ago, quantity=2):
+        sale = Sales.objects.create(transaction_id=transaction_id, total_amount=10 * quantity, user=self.user)
+        Sales.objects.filter(pk=sale.pk).update(date_added=timezone.now() - datetime.timedelta(days=days_ago))
+        SalesItem.objects.create(sale=sale, product=self.product, quantity=quantity, price=10, total=10 * quantity)
+        return sale
+
+    def archive(self, **options):
+        call_command('archive_sales', stdout=StringIO(), **options)
+
+    def test_moves_old_sales_and_items_in_batches(self):
+        for i in range(5):
+            self.make_sale(f'OLD-{i}', days_ago=400)
+        self.make_sale('NEW-1', days_ago=1)
+
+        self.archive(batch_size=2)
+
+        self.assertEqual(list(Sales.objects.values_list('transaction_id', flat=True)), ['NEW-1'])
+        self.assertEqual(SalesItem.objects.count(), 1)
+        self.assertEqual(ArchivedSales.objects.count(), 5)
+        self.assertEqual(ArchivedSalesItem.objects.count(), 5)
+        archived = ArchivedSales.objects.get(transaction_id='OLD-3')
+        self.assertEqual(archived.user, self.user)
+        self.assertEqual(archived.items.get().quantity, 2)
+        self.assertLess(archived.date_added, timezone.now() - datetime.timedelta(days=365))
+
+    def test_dry_run_moves_nothing(self):
+        self.make_sale('OLD-1', days_ago=400)
+        self.archive(dry_run=True)
+        self.assertEqual(Sales.objects.count(), 1)
+        self.assertFalse(ArchivedSales.objects.exists())
+
+    def test_invoice_falls_back_to_archive(self):
+        self.make_sale('OLD-1', days_ago=400)
+        self.archive()
+        resp = self.client.get(reverse('invoice', args=['OLD-1']))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, 'OLD-1')
+        self.assertEqual(self.client.get(reverse('invoice', args=['MISSING'])).status_code, 404)
+
+    def test_sales_list_includes_archive(self):
+        self.make_sale('OLD-1', days_ago=400)
+        self.make_sale('NEW-1', days_ago=1)
+        self.archive()
+        url = reverse('sales_list')
+        end = timezone.now().date().isoformat()
+        for params in ({}, {'end_date': end}, {'search_txn': 'OLD'}):
+            resp = self.client.get(url, params)
+            self.assertContains(resp, 'OLD-1', msg_prefix=str(params))
+        recent_start = (timezone.now().date() - datetime.timedelta(days=30)).isoformat()
+        resp = self.client.get(url, {'start_date': recent_start})
+        self.assertContains(resp, 'NEW-1')
+        self.assertNotContains(resp, 'OLD-1')
+
+    def test_start_date_on_the_newest_archived_day_reaches_the_archive(self):
+        # just past the horizon, so archived but on the cutoff day itself
+        sale = self.make_sale('EDGE-1', days_ago=365.001)
+        self.archive()
+        edge_day = timezone.localtime(ArchivedSales.objects.get().date_added).date().isoformat()
+        self.assertContains(self.client.get(reverse('sales_list'), {'start_date': edge_day}), sale.transaction_id)
+
+    def test_archive_run_with_fewer_days_stays_reachable(self):
+        self.make_sale('MID-1', days_ago=60, quantity=3)
+        self.archive(days=30)
+        start = (timezone.now().date() - datetime.timedelta(days=90)).isoformat()
+        self.assertContains(self.client.get(reverse('sales_list'), {'start_date': start}), 'MID-1')
+        data = self.client.get(reverse('reports_data'), {'start_date': start}).json()
+        self.assertEqual(data['grand_total'], 30.0)
+
+    def test_sales_list_paginates_across_hot_and_archive(self):
+        for i in range(20):
+            self.make_sale(f'OLD-{i:02d}', days_ago=400 + i)
+        for i in range(20):
+            self.make_sale(f'NEW-{i:02d}', days_ago=i)
+        self.archive()
+        first = self.client.get(reverse('sales_list'))
+        second = self.client.get(reverse('sales_list'), {'page': 2})
+        self.assertEqual(first.context['page_obj'].paginator.count, 40)
+        self.assertEqual([s.transaction_id for s in first.context['page_obj']][-5:],
+                         ['OLD-00', 'OLD-01', 'OLD-02', 'OLD-03', 'OLD-04'])
+        self.assertEqual(len(second.context['page_obj']), 15)
+        self.assertEqual(second.context['page_obj'][0].transaction_id, 'OLD-05')
+
+    def test_reports_include_archive(self):
+        self.make_sale('OLD-1', days_ago=400, quantity=3)
+        self.make_sale('NEW-1', days_ago=1, quantity=1)
+        self.archive()
+        data = self.client.get(reverse('reports_data'), {'granularity': 'monthly'}).json()
+        self.assertEqual(data['grand_total'], 40.0)
+        csv_rows = self.client.get(reverse('reports_export')).content.decode().strip().splitlines()
+        self.assertEqual(len(csv_rows), 3)
+        resp = self.client.get(reverse('reports'))
+        self.assertEqual(sum(row['total'] for row in resp.context['sales_data']), 40)
+
+
+class StockDecrementTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cashier', password='secret')
+        self.client.force_login(self.user)
+        self.pen = Product.objects.create(barcode='111', name='Pen', price=10, cost=6, stock_quantity=50)
+        self.ink = Product.objects.create(barcode='222', name='Ink', price=5, cost=3, stock_quantity=0)
+
+    def sell(self, items, location=None):
+        payload = {'items': [{'id': p.id, 'quantity': q} for p, q in items]}
+        if location is not None:
+            payload['location'] = location
+        return self.client.post(reverse('save_sale'), json.dumps(payload), content_type='application/json').json()
+
+    def test_sale_without_location_uses_product_stock(self):
+        self.assertTrue(self.sell([(self.pen, 3)])['success'])
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock_quantity, 47)
+
+    def test_product_without_location_rows_sells_at_any_counter(self):
+        counter = StockLocation.objects.create(name='Counter 1')
+        self.assertTrue(self.sell([(self.pen, 3)], location=counter.id)['success'])
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock_quantity, 47)
+        self.assertEqual(Sales.objects.get().location, counter)
+
+    def test_located_product_decrements_only_the_selling_counter(self):
+        c1 = StockLocation.objects.create(name='Counter 1')
+        c2 = StockLocation.objects.create(name='Counter 2')
+        ProductStock.objects.create(product=self.ink, location=c1, quantity=4)
+        ProductStock.objects.create(product=self.ink, location=c2, quantity=6)
+
+        self.assertTrue(self.sell([(self.ink, 3)], location=c1.id)['success'])
+        self.assertEqual(ProductStock.objects.get(location=c1).quantity, 1)
+        self.assertEqual(ProductStock.objects.get(location=c2).quantity, 6)
+
+        # counter 1 cannot borrow from counter 2 or from Product.stock_quantity
+        self.assertFalse(self.sell([(self.ink, 2)], location=c1.id)['success'])
+        resp = self.client.get(reverse('get_product'), {'barcode': '222', 'location': c2.id}).json()
+        self.assertEqual((resp['stock'], resp['location_stock']), (7, 6))
+
+    def test_located_product_requires_a_location(self):
+        counter = StockLocation.objects.create(name='Counter 1')
+        ProductStock.objects.create(product=self.pen, location=counter, quantity=5)
+        # the 50 units on Product.stock_quantity are not sellable any more
+        resp = self.sell([(self.ink, 0), (self.pen, 3)])
+        self.assertFalse(resp['success'])
+        self.assertIn('stock location', resp['error'])
+        self.assertEqual(ProductStock.objects.get().quantity, 5)
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock_quantity, 50)
+        self.assertFalse(Sales.objects.exists())
+        self.assertEqual(total_stock(self.pen.id), 5)
+
+    def test_insufficient_stock_rolls_back_whole_sale(self):
+        resp = self.sell([(self.pen, 5), (self.ink, 1)])
+        self.assertFalse(resp['success'])
+        self.assertIn('Ink', resp['error'])
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock_quantity, 50)
+        self.assertFalse(Sales.objects.exists())
+        self.assertFalse(SalesItem.objects.exists())
+
+    def test_invalid_location_returns_json_error(self):
+        resp = self.client.get(reverse('get_product'), {'barcode': '111', 'location': 'abc'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), {'success': False, 'error': 'Invalid stock location'})
+        self.assertFalse(self.sell([(self.pen, 1)], location='abc')['success'])
+
+    def test_low_stock_counts_location_totals(self):
+        counter = StockLocation.objects.create(name='Counter 1')
+        ProductStock.objects.create(product=self.ink, location=counter, quantity=20)
+        # pen has 50 on the product row, ink has 20 across locations
+        self.assertEqual(low_stock_count(), 0)
+        ProductStock.objects.filter(product=self.ink).update(quantity=5)
+        self.assertEqual(low_stock_count(), 1)
+
+    def test_location_edits_clear_cached_total(self):
+        counter = StockLocation.objects.create(name='Counter 1')
+        row = ProductStock.objects.create(product=self.ink, location=counter, quantity=20)
+        self.assertEqual(total_stock(self.ink.id), 20)
+        # as saved from the admin
+        row.quantity = 8
+        row.save()
+        self.assertEqual(total_stock(self.ink.id), 8)
+        row.delete()
+        self.assertEqual(total_stock(self.ink.id), 0)
+
+    @override_settings(STORAGES=TEST_STORAGES)
+    def test_product_pages_show_location_totals(self):
+        c1 = StockLocation.objects.create(name='Counter 1')
+        c2 = StockLocation.objects.create(name='Counter 2')
+        ProductStock.objects.create(product=self.ink, location=c1, quantity=4)
+        ProductStock.objects.create(product=self.ink, location=c2, quantity=9)
+
+        listed = {p.pk: p for p in self.client.get(reverse('product_list')).context['page_obj']}
+        self.assertEqual((listed[self.pen.pk].total_stock, listed[self.ink.pk].total_stock), (50, 13))
+
+        form = self.client.get(reverse('product_update', args=[self.ink.pk]))
+        self.assertEqual(form.context['location_total'], 13)
+        self.assertNotContains(form, 'name="stock"')
+
+        # a stock field in the POST is ignored while the product has location rows
+        self.client.post(reverse('product_update', args=[self.ink.pk]), {
+            'barcode': '222', 'name': 'Ink', 'price': 5, 'cost': 3, 'stock': 99, 'gst': 0})
+        self.ink.refresh_from_db()
+        self.assertEqual(self.ink.stock_quantity, 0)
+        self.client.post(reverse('product_update', args=[self.pen.pk]), {
+            'barcode': '111', 'name': 'Pen', 'price': 10, 'cost': 6, 'stock': 40, 'gst': 0})
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock_quantity, 40)
+
+
+class CatalogTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('cashier', password='secret'))
+        self.pen = Product.objects.create(barcode='111', name='Pen', price=10, cost=6, stock_quantity=50)
+
+    def test_scan_sees_edits_made_without_local_signals(self):
+        self.client.get(reverse('get_product'), {'barcode': '111'})
+        # an edit saved by another worker never reaches this process's cache
+        Product.objects.filter(pk=self.pen.pk).update(name='Gel Pen', price=12, gst_percentage=18)
+        resp = self.client.get(reverse('get_product'), {'barcode': '111'}).json()
+        self.assertEqual((resp['name'], resp['price'], resp['gst']), ('Gel Pen', 12.0, 18.0))
+
+
+class ProductAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pen = Product.objects.create(barcode='111', name='Pen', price=10, cost=6, stock_quantity=30)
+        self.ink = Product.objects.create(barcode='222', name='Ink', price=5, cost=4, stock_quantity=0)
+
+    def sell(self, product, quantity, price, model=Sales, item_model=SalesItem, txn='TRX-1'):
+        sale = model.objects.create(transaction_id=txn, total_amount=price * quantity,
+                                    **({'date_added': timezone.now()} if model is ArchivedSales else {}))
+        item_model.objects.create(sale=sale, product=product, quantity=quantity, price=price, total=price * quantity)
+
+    def test_aggregate_line_items_groups_by_product(self):
+        uniq, units, revenue = aggregate_line_items(
+            np.array([7, 3, 7, 3, 9]), np.array([1, 2, 3, 4, 5]), np.array([10.0, 1.0, 30.0, 2.0, 0.5]))
+        self.assertEqual(uniq.tolist(), [3, 7, 9])
+        self.assertEqual(units.tolist(), [6, 4, 5])
+        self.assertEqual(revenue.tolist(), [3.0, 40.0, 0.5])
+        empty = aggregate_line_items(*(np.array([], dtype=np.int64),) * 2, np.array([]))
+        self.assertTrue(all(a.size == 0 for a in empty))
+
+    def test_classify_abc_boundaries(self):
+        self.assertEqual(classify_abc(np.array([50.0, 30.0, 15.0, 5.0])).tolist(), ['A', 'A', 'B', 'C'])
+        self.assertEqual(classify_abc(np.array([5.0, 15.0, 50.0, 30.0])).tolist(), ['C', 'B', 'A', 'A'])
+        self.assertEqual(classify_abc(np.array([0.0, 0.0])).tolist(), ['C', 'C'])
+
+    def test_margin_and_sell_through(self):
+        self.sell(self.pen, 10, 10)
+        self.sell(self.ink, 4, 5, model=ArchivedSales, item_model=ArchivedSalesItem, txn='OLD-1')
+        data = product_performance()
+        pen, ink = data['products']
+        self.assertEqual((pen['name'], pen['units'], pen['revenue']), ('Pen', 10, 100.0))
+        self.assertEqual((pen['gross_margin'], pen['margin_pct']), (40.0, 40.0))
+        # 10 sold out of 10 sold + 30 left
+        self.assertEqual(pen['sell_through'], 25.0)
+        self.assertEqual((ink['gross_margin'], ink['sell_through']), (4.0, 100.0))
+        self.assertEqual((data['total_revenue'], data['total_margin']), (120.0, 44.0))
+
+    def test_deleted_products_still_count(self):
+        self.sell(self.pen, 2, 10)
+        self.ink.delete()
+        SalesItem.objects.create(sale=Sales.objects.get(), product=None, quantity=3, price=5, total=15)
+        data = product_performance()
+        self.assertEqual(data['total_revenue'], 35.0)
+        self.assertEqual(data['total_revenue'], float(sum(SalesItem.objects.values_list('total', flat=True))))
+        deleted = next(p for p in data['products'] if p['id'] is None)
+        self.assertEqual((deleted['name'], deleted['units']), ('Deleted product', 3))
+
+    def test_sell_through_uses_location_stock(self):
+        counter = StockLocation.objects.create(name='Counter 1')
+        ProductStock.objects.create(product=self.pen, location=counter, quantity=10)
+        self.sell(self.pen, 10, 10)
+        # 10 left at the counter; the 30 on Product.stock_quantity no longer count
+        self.assertEqual(product_performance()['products'][0]['sell_through'], 50.0)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class DashboardStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('manager', password='secret')
+        self.client.force_login(self.user)
+        self.pen = Product.objects.create(barcode='111', name='Pen', price=10, cost=6, stock_quantity=50)
+
+    def read_event(self):
+        resp = self.client.get(reverse('dashboard_stream'))
+        self.assertEqual(resp['Content-Type'], 'text/event-stream')
+        body = resp.content.decode()
+        self.assertIn('retry: ', body)
+        return json.loads(body.split('data: ', 1)[1])
+
+    def test_wsgi_returns_one_snapshot_and_reflects_new_sales(self):
+        self.read_event()
+        self.client.post(reverse('save_sale'), json.dumps({'items': [{'id': self.pen.id, 'quantity': 2}]}),
+                         content_type='application/json')
+        event = self.read_event()
+        self.assertEqual(float(event['sales_today']), 20.0)
+        self.assertIn(Sales.objects.get().transaction_id, event['recent_sales_html'])
+
+    def test_stream_rows_match_rendered_dashboard(self):
+        Sales.objects.create(transaction_id='TRX-1', total_amount=15)
+        page = self.client.get(reverse('dashboard')).content.decode()
+        self.assertIn(self.read_event()['recent_sales_html'].strip(), page)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class StaticAssetsTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('cashier', password='secret'))
+
+    def test_templates_reference_only_committed_static_files(self):
+        template_dir = settings.BASE_DIR / 'templates'
+        for path in template_dir.rglob('*.html'):
+            for asset in re.findall(r"{% static '([^']+)' %}", path.read_text(encoding='utf-8')):
+                self.assertIsNotNone(finders.find(asset), f"{path.name} references missing {asset}")
+
+    def test_scanner_pages_load_no_third_party_scripts(self):
+        for name in ('billing.html', 'product_form.html', 'reports.html'):
+            text = (settings.BASE_DIR / 'templates' / 'store' / name).read_text(encoding='utf-8')
+            self.assertNotIn('://', text, name)
+
+    def test_every_vendored_library_ships_its_license(self):
+        vendor_dir = settings.BASE_DIR / 'static' / 'vendor'
+        for library in vendor_dir.iterdir():
+            self.assertTrue((library / 'LICENSE').exists(), library.name)
+
+    def test_service_worker_precaches_only_existing_files(self):
+        body = self.client.get(reverse('service_worker')).content.decode()
+        urls = json.loads(re.search(r'PRECACHE_URLS = (\[.*\]);', body).group(1))
+        for url in urls[1:]:
+            self.assertIsNotNone(finders.find(url.removeprefix(settings.STATIC_URL)), url)
+        self.assertIn(static('vendor/html5-qrcode/html5-qrcode-2.3.8.min.js'), urls)
+
+    def test_reports_export_pdf(self):
+        Sales.objects.create(transaction_id='TRX-1', total_amount=15)
+        resp = self.client.get(reverse('reports_export'), {'format': 'pdf'})
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+        self.assertTrue(resp.content.startswith(b'%PDF'))
+
+
+class SessionSettingsTests(SimpleTestCase):
+    def test_session_mode_mapping(self):
+        self.assertEqual(session_engine('db', shared_cache=False), 'django.contrib.sessions.backends.db')
+        self.assertEqual(session_engine('signed_cookies', shared_cache=False),
+                         'django.contrib.sessions.backends.signed_cookies')
+        self.assertEqual(session_engine('cached_db', shared_cache=True), 'django.contrib.sessions.backends.cached_db')
+        with self.assertRaises(ImproperlyConfigured):
+            session_engine('cached_db', shared_cache=False)
+        with self.assertRaises(ImproperlyConfigured):
+            session_engine('file', shared_cache=True)
+
+    def test_user_cache_needs_shared_cache(self):
+        self.assertEqual(user_cache_seconds(None, shared_cache=False), 0)
+        self.assertEqual(user_cache_seconds(None, shared_cache=True), 30)
+        self.assertEqual(user_cache_seconds(0, shared_cache=False), 0)
+        with self.assertRaises(ImproperlyConfigured):
+            user_cache_seconds(30, shared_cache=False)
+
+    def test_cache_url(self):
+        self.assertEqual(cache_settings('')['default']['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+        self.assertEqual(cache_settings('redis://cache:6379/0')['default'],
+                         {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379/0'})
+        self.assertEqual(cache_settings('memcached://cache:11211')['default']['LOCATION'], 'cache:11211')
+        with self.assertRaises(ImproperlyConfigured):
+            cache_settings('ftp://cache')
+
+
+@override_settings(USER_CACHE_SECONDS=30)
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cashier', password='secret')
+        self.backend = CachedModelBackend()
+
+    def test_hit_skips_the_query(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_disabled_always_queries(self):
+        with self.settings(USER_CACHE_SECONDS=0):
+            self.backend.get_user(self.user.pk)
+            with self.assertNumQueries(1):
+                self.backend.get_user(self.user.pk)
+
+    def test_save_and_delete_invalidate(self):
+        self.backend.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        # inactive users are rejected by ModelBackend.get_user()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+        self.user.is_active = True
+        self.user.save()
+        self.assertIsNotNone(self.backend.get_user(self.user.pk))
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class DashboardStreamAsgiTests(TransactionTestCase):
+    # the broker's DB work runs on executor threads, which need committed rows
+
+    async def test_stream_waits_on_the_loop_and_pushes_published_sales(self):
+        user = await sync_to_async(User.objects.create_user)('manager', password='secret')
+        await self.async_client.aforce_login(user)
+        resp = await self.async_client.get(reverse('dashboard_stream'))
+        self.assertEqual(resp['Content-Type'], 'text/event-stream')
+        stream = resp.streaming_content
+        self.assertIn(b'event: dashboard', await anext(stream))
+
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.1)
+        # the open stream is parked on an asyncio.Event, not in a thread
+        self.assertEqual(len(dashboard_broker._waiters), 1)
+        self.assertFalse(pending.done())
+
+        await sync_to_async(Sales.objects.create)(transaction_id='TRX-LIVE', total_amount=15)
+        await sync_to_async(dashboard_broker.publish)()
+        self.assertIn(b'TRX-LIVE', await asyncio.wait_for(pending, 2))
+
+        # a client disconnect cancels the response task mid-wait
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.1)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual((dashboard_broker._subscribers, len(dashboard_broker._waiters)), (0, 0))
+
+
+# warm_up() closes the database connection, which TestCase's wrapping transaction does not allow
+class WarmUpTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.loader = engines['django'].engine.template_loaders[0]
+        self.loader.reset()
+        Category.objects.create(name='Stationery')
+        self.pen = Product.objects.create(barcode='111', name='Pen', price=10, cost=6, stock_quantity=50)
+
+    def test_warm_up_fills_caches_before_the_first_request(self):
+        self.assertIsInstance(warm_up(), float)
+        self.assertTrue(set(WARM_TEMPLATES) <= set(self.loader.get_template_cache))
+        with self.assertNumQueries(0):
+            self.assertEqual(total_stock(self.pen.id), 50)
+            self.assertEqual([c['name'] for c in cached_categories()], ['Stationery'])
+            self.assertEqual(dashboard_broker._snapshot['total_products'], 1)
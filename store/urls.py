@@ -5,6 +5,7 @@ from django.contrib.auth import views as auth_views
 urlpatterns = [
     path('', auth_views.LoginView.as_view(template_name='login.html', redirect_authenticated_user=True), name='root'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/stream/', views.dashboard_stream, name='dashboard_stream'),
     path('login/', auth_views.LoginView.as_view(template_name='login.html', redirect_authenticated_user=True), name='login'),
     path('logout/', views.logout_user, name='logout'),
     
@@ -14,6 +15,7 @@ urlpatterns = [
     path('products/<int:pk>/delete/', views.product_delete, name='product_delete'),
     
     path('billing/', views.billing, name='billing'),
+    path('sw.js', views.service_worker, name='service_worker'),
     path('api/get-product/', views.get_product, name='get_product'),
     path('api/save-sale/', views.save_sale, name='save_sale'),
     
@@ -22,6 +24,7 @@ urlpatterns = [
     
     path('reports/', views.reports, name='reports'),
     path('reports/data/', views.reports_data, name='reports_data'),
+    path('reports/products/', views.reports_products, name='reports_products'),
     path('reports/export/', views.reports_export, name='reports_export'),
     
     path('categories/', views.category_list, name='category_list'),
@@ -1,13 +1,25 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
-from django.db.models import Sum, Count, F
-from .models import Product, Category, Sales, SalesItem
-from django.db import IntegrityError
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.db.models import Sum, Count, F, Max
+from .models import Product, Category, Sales, SalesItem, ArchivedSales, StockLocation
+from .catalog import product_by_barcode, cached_categories
+from .stock import (total_stock, location_stock, low_stock_count, decrement_stock, invalidate_total_stock,
+                    total_stock_expression)
+from .analytics import product_performance
+from .events import dashboard_broker, format_event
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from django.templatetags.static import static
+from django.urls import reverse
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
 import json
 import datetime
+import hashlib
+import uuid
 from django.contrib import messages
 from django.core.paginator import Paginator
 
@@ -18,7 +30,7 @@ def dashboard(request):
     total_products = Product.objects.count()
     today = timezone.now().date()
     sales_today = Sales.objects.filter(date_added__date=today).aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-    low_stock = Product.objects.filter(stock_quantity__lt=10).count()
+    low_stock = low_stock_count()
     
     recent_sales = Sales.objects.order_by('-date_added')[:5]
     
@@ -30,9 +42,38 @@ def dashboard(request):
     }
     return render(request, 'dashboard.html', context)
 
+async def _adashboard_events():
+    version, snapshot = await dashboard_broker.subscribe()
+    try:
+        yield format_event(snapshot)
+        while True:
+            version, snapshot = await dashboard_broker.wait(version, settings.DASHBOARD_STREAM_POLL_SECONDS)
+            yield format_event(snapshot) if snapshot is not None else ": keepalive\n\n"
+    finally:
+        dashboard_broker.unsubscribe()
+
+@login_required
+async def dashboard_stream(request):
+    # Server-Sent Events feed for dashboard.html. Under ASGI the connection
+    # stays open and only holds a coroutine. Under WSGI a held connection
+    # would pin a whole sync worker, so each request returns the current
+    # snapshot and EventSource reconnects after the poll interval.
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(_adashboard_events(), content_type='text/event-stream')
+    else:
+        snapshot = await sync_to_async(dashboard_broker.current)()
+        response = HttpResponse(format_event(snapshot, retry=settings.DASHBOARD_STREAM_POLL_SECONDS),
+                                content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @login_required
 def product_list(request):
-    products = Product.objects.all().order_by('-id')
+    # per-location products show the sum of their ProductStock rows
+    products = Product.objects.annotate(
+        total_stock=total_stock_expression(), stock_locations=Count('stocks')
+    ).order_by('-id')
     paginator = Paginator(products, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -110,18 +151,23 @@ def product_create(request):
 @login_required
 def product_update(request, pk):
     product = get_object_or_404(Product, pk=pk)
+    # stocked per location: quantities are edited on the ProductStock rows
+    stock_locations = list(product.stocks.select_related('location').order_by('location__name'))
+    location_total = sum(row.quantity for row in stock_locations)
     if request.method == 'POST':
         new_barcode = request.POST.get('barcode')
         # ensure barcode update won't conflict with an existing product
         if Product.objects.exclude(pk=product.pk).filter(barcode=new_barcode).exists():
             messages.error(request, 'Another product with this barcode already exists.')
-            return render(request, 'store/product_form.html', {'product': product})
+            return render(request, 'store/product_form.html', {
+                'product': product, 'stock_locations': stock_locations, 'location_total': location_total})
 
         product.barcode = new_barcode
         product.name = request.POST.get('name')
         product.price = request.POST.get('price')
         product.cost = request.POST.get('cost')
-        product.stock_quantity = request.POST.get('stock')
+        if not stock_locations:
+            product.stock_quantity = request.POST.get('stock')
         product.gst_percentage = request.POST.get('gst')
         category_val = request.POST.get('category')
         if category_val:
@@ -131,10 +177,16 @@ def product_update(request, pk):
                 category, created = Category.objects.get_or_create(name=category_val)
             product.category = category
         product.save()
+        invalidate_total_stock([product.pk])
         messages.success(request, 'Product updated successfully')
         return redirect('product_list')
     categories = Category.objects.all().order_by('name')
-    return render(request, 'store/product_form.html', {'product': product, 'categories': categories})
+    return render(request, 'store/product_form.html', {
+        'product': product,
+        'categories': categories,
+        'stock_locations': stock_locations,
+        'location_total': location_total,
+    })
 
 @login_required
 def product_delete(request, pk):
@@ -147,24 +199,60 @@ def product_delete(request, pk):
 
 @login_required
 def billing(request):
-    return render(request, 'store/billing.html')
+    locations = StockLocation.objects.all().order_by('name')
+    return render(request, 'store/billing.html', {'locations': locations})
+
+# Static files the billing page needs to start without a network connection
+BILLING_SHELL_ASSETS = [
+    'css/style.css',
+    'js/lazy-load.js',
+    'vendor/bootstrap/bootstrap-5.3.8.min.css',
+    'vendor/bootstrap/bootstrap-5.3.8.bundle.min.js',
+    'vendor/jquery/jquery-3.7.1.min.js',
+    'vendor/html5-qrcode/html5-qrcode-2.3.8.min.js',
+    'js/barcode-scanner.js',
+]
+
+def service_worker(request):
+    # served from the site root so its scope covers /billing/
+    precache_urls = [reverse('billing')] + [static(path) for path in BILLING_SHELL_ASSETS]
+    version = hashlib.md5(json.dumps(precache_urls).encode()).hexdigest()[:12]
+    response = render(request, 'sw.js', {
+        'precache_urls': json.dumps(precache_urls),
+        'version': version,
+        'static_url': settings.STATIC_URL,
+    }, content_type='application/javascript')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+def _parse_location(value):
+    # empty means "no location"; anything else must be a location id
+    if value in (None, ''):
+        return None
+    return int(value)
 
 @login_required
 def get_product(request):
     barcode = request.GET.get('barcode')
     try:
-        product = Product.objects.get(barcode=barcode)
-        return JsonResponse({
-            'success': True,
-            'barcode': product.barcode,
-            'id': product.id,
-            'name': product.name,
-            'price': float(product.price),
-            'stock': product.stock_quantity,
-            'gst': float(product.gst_percentage)
-        })
-    except Product.DoesNotExist:
+        location_id = _parse_location(request.GET.get('location'))
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'error': 'Invalid stock location'})
+    product = product_by_barcode(barcode)
+    if product is None:
         return JsonResponse({'success': False, 'error': 'Product not found'})
+    data = {
+        'success': True,
+        'barcode': product['barcode'],
+        'id': product['id'],
+        'name': product['name'],
+        'price': product['price'],
+        'stock': total_stock(product['id']),
+        'gst': product['gst']
+    }
+    if location_id:
+        data['location_stock'] = location_stock(product['id'], location_id)
+    return JsonResponse(data)
 
 @login_required
 def save_sale(request):
@@ -173,59 +261,64 @@ def save_sale(request):
             data = json.loads(request.body)
             items = data.get('items')
             customer_name = data.get('customer_name')
+            try:
+                location_id = _parse_location(data.get('location'))
+            except (TypeError, ValueError):
+                return JsonResponse({'success': False, 'error': 'Invalid stock location'})
             
             if not items:
                 return JsonResponse({'success': False, 'error': 'No items in cart'})
+            if location_id and not StockLocation.objects.filter(pk=location_id).exists():
+                return JsonResponse({'success': False, 'error': 'Unknown stock location'})
                 
-            transaction_id = f"TRX-{int(timezone.now().timestamp())}"
-            sale = Sales.objects.create(
-                transaction_id=transaction_id,
-                customer_name=customer_name,
-                user=request.user,
-                total_amount=0
-            )
-            
-            total_amount = 0
-            
-            for item in items:
-                product_id = item.get('id')
-                quantity = int(item.get('quantity'))
-                
-                product = Product.objects.get(id=product_id)
-                
-                if product.stock_quantity < quantity:
-                    sale.delete()
-                    return JsonResponse({'success': False, 'error': f'Not enough stock for {product.name}'})
-                
-                product.stock_quantity -= quantity
-                product.save()
-                
-                SalesItem.objects.create(
-                    sale=sale,
-                    product=product,
-                    quantity=quantity,
-                    price=product.price,
-                    total=product.price * quantity
+            # suffix keeps ids unique when several counters check out in the same second
+            transaction_id = f"TRX-{int(timezone.now().timestamp())}-{uuid.uuid4().hex[:6].upper()}"
+            with transaction.atomic():
+                sale = Sales.objects.create(
+                    transaction_id=transaction_id,
+                    customer_name=customer_name,
+                    user=request.user,
+                    location_id=location_id,
+                    total_amount=0
                 )
                 
-                total_amount += (float(product.price) * quantity)
+                total_amount = 0
+                product_ids = []
                 
-            sale.total_amount = total_amount
-            sale.save()
+                for item in items:
+                    product_id = item.get('id')
+                    quantity = int(item.get('quantity'))
+                    
+                    product = Product.objects.get(id=product_id)
+                    
+                    # conditional UPDATE on the selling location's row only
+                    if not decrement_stock(product, quantity, location_id):
+                        transaction.set_rollback(True)
+                        return JsonResponse({'success': False, 'error': f'Not enough stock for {product.name}'})
+                    product_ids.append(product.id)
+                    
+                    SalesItem.objects.create(
+                        sale=sale,
+                        product=product,
+                        quantity=quantity,
+                        price=product.price,
+                        total=product.price * quantity
+                    )
+                    
+                    total_amount += (float(product.price) * quantity)
+                    
+                sale.total_amount = total_amount
+                sale.save()
             
+            invalidate_total_stock(product_ids)
+            dashboard_broker.publish()
             return JsonResponse({'success': True, 'transaction_id': transaction_id})
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
     return JsonResponse({'success': False, 'error': 'Invalid request'})
 
-@login_required
-def sales_list(request):
-    qs = Sales.objects.all().order_by('-date_added')
-    # filters from query params
-    start = request.GET.get('start_date')
-    end = request.GET.get('end_date')
-    category_id = request.GET.get('category')
-    search_txn = request.GET.get('search_txn', '').strip()
+def _filter_sales(qs, start, end, category_id, search_txn):
+    # shared by the hot Sales table and the ArchivedSales fallback
     if search_txn:
         qs = qs.filter(transaction_id__icontains=search_txn)
     if start:
@@ -242,16 +335,90 @@ def sales_list(request):
             pass
     if category_id:
         try:
-            cid = int(category_id)
-            qs = qs.filter(items__product__category__id=cid).distinct()
-            selected_category = cid
+            qs = qs.filter(items__product__category__id=int(category_id)).distinct()
         except Exception:
-            selected_category = None
-    else:
+            pass
+    return qs
+
+
+def _needs_archive(start, search_txn):
+    # only touch the archive when the request can reach the newest archived
+    # sale; an open-ended range (no start date) always can. Deciding from the
+    # data rather than SALES_ARCHIVE_DAYS stays right whatever --days
+    # archive_sales ran with, and MAX over the indexed date_added is a single
+    # index lookup, so it is not cached (a stale per-worker horizon would hide
+    # freshly archived sales).
+    if search_txn or not start:
+        return True
+    try:
+        start_date = datetime.datetime.strptime(start, '%Y-%m-%d').date()
+    except Exception:
+        return True
+    newest = ArchivedSales.objects.aggregate(newest=Max('date_added'))['newest']
+    if newest is None:
+        return False
+    return start_date <= timezone.localtime(newest).date()
+
+
+class _ChainedSales:
+    """Hot sales followed by archived sales, sliced lazily for Paginator.
+
+    Archived rows are always older than hot rows, so concatenating the two
+    '-date_added' querysets keeps the overall ordering.
+    """
+
+    def __init__(self, hot, archived):
+        self.hot = hot
+        self.archived = archived
+        self._hot_count = None
+
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self):
+        return self.hot_count() + self.archived.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        hot_count = self.hot_count()
+        rows = list(self.hot[start:min(stop, hot_count)]) if start < hot_count else []
+        if stop > hot_count:
+            rows += list(self.archived[max(start - hot_count, 0):stop - hot_count])
+        return rows
+
+
+@login_required
+def sales_list(request):
+    # filters from query params
+    start = request.GET.get('start_date')
+    end = request.GET.get('end_date')
+    category_id = request.GET.get('category')
+    search_txn = request.GET.get('search_txn', '').strip()
+    qs = _filter_sales(Sales.objects.all(), start, end, category_id, search_txn).order_by('-date_added')
+    try:
+        selected_category = int(category_id) if category_id else None
+    except Exception:
         selected_category = None
 
-    categories = Category.objects.all().order_by('name')
-    return render(request, 'store/sales_list.html', {'sales': qs, 'categories': categories, 'selected_category': selected_category, 'start_date': start, 'end_date': end, 'search_txn': search_txn})
+    sales = qs
+    if _needs_archive(start, search_txn):
+        archived = _filter_sales(ArchivedSales.objects.all(), start, end, category_id, search_txn).order_by('-date_added')
+        sales = _ChainedSales(qs, archived)
+
+    paginator = Paginator(sales, 25)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    # build a compact page number window for navigation
+    current = page_obj.number
+    total = paginator.num_pages
+    window = 3
+    page_numbers = range(max(1, current - window), min(total, current + window) + 1)
+
+    categories = cached_categories()
+    return render(request, 'store/sales_list.html', {'page_obj': page_obj, 'page_numbers': page_numbers, 'total_pages': total, 'categories': categories, 'selected_category': selected_category, 'start_date': start, 'end_date': end, 'search_txn': search_txn})
 
 
 @login_required
@@ -317,22 +484,47 @@ def add_category(request):
 
 @login_required
 def categories_api(request):
-    cats = list(Category.objects.all().order_by('name').values('id', 'name'))
+    cats = cached_categories()
     return JsonResponse({'categories': cats})
 
 @login_required
 def invoice(request, transaction_id):
-    sale = get_object_or_404(Sales, transaction_id=transaction_id)
+    sale = Sales.objects.filter(transaction_id=transaction_id).first()
+    if sale is None:
+        # older transactions may have been moved out by archive_sales
+        sale = get_object_or_404(ArchivedSales, transaction_id=transaction_id)
     return render(request, 'store/invoice.html', {'sale': sale})
 
 @login_required
 def reports(request):
     # Simple reporting logic
     # sales_data used by original server-rendered table as fallback
-    sales_data = Sales.objects.values('date_added__date').annotate(total=Sum('total_amount')).order_by('-date_added__date')
+    totals = {}
+    for model in (Sales, ArchivedSales):
+        for row in model.objects.values('date_added__date').annotate(total=Sum('total_amount')):
+            day = row['date_added__date']
+            totals[day] = totals.get(day, 0) + (row['total'] or 0)
+    sales_data = [{'date_added__date': day, 'total': totals[day]} for day in sorted(totals, reverse=True)]
     return render(request, 'store/reports.html', {'sales_data': sales_data})
 
 
+def _period_totals(start, end, granularity):
+    # (period, total) pairs over hot sales, plus the archive when the range
+    # reaches past the hot horizon
+    trunc = {'weekly': TruncWeek, 'monthly': TruncMonth}.get(granularity, TruncDay)
+    models = (Sales, ArchivedSales) if _needs_archive(start, None) else (Sales,)
+    totals = {}
+    for model in models:
+        qs = _filter_sales(model.objects.all(), start, end, None, None)
+        data = qs.annotate(period=trunc('date_added')).values('period').annotate(total=Sum('total_amount'))
+        for item in data:
+            p = item.get('period')
+            if p is None:
+                continue
+            totals[p] = totals.get(p, 0) + (item.get('total') or 0)
+    return [(p, totals[p]) for p in sorted(totals)]
+
+
 @login_required
 def reports_data(request):
     # API endpoint returning aggregated sales data in JSON
@@ -340,36 +532,12 @@ def reports_data(request):
     end = request.GET.get('end_date')
     granularity = request.GET.get('granularity', 'daily')
 
-    qs = Sales.objects.all()
-    if start:
-        try:
-            start_dt = datetime.datetime.strptime(start, '%Y-%m-%d')
-            qs = qs.filter(date_added__date__gte=start_dt.date())
-        except Exception:
-            pass
-    if end:
-        try:
-            end_dt = datetime.datetime.strptime(end, '%Y-%m-%d')
-            qs = qs.filter(date_added__date__lte=end_dt.date())
-        except Exception:
-            pass
-
-    if granularity == 'weekly':
-        data = qs.annotate(period=TruncWeek('date_added')).values('period').annotate(total=Sum('total_amount')).order_by('period')
-    elif granularity == 'monthly':
-        data = qs.annotate(period=TruncMonth('date_added')).values('period').annotate(total=Sum('total_amount')).order_by('period')
-    else:
-        data = qs.annotate(period=TruncDay('date_added')).values('period').annotate(total=Sum('total_amount')).order_by('period')
-
     # prepare response lists
     labels = []
     totals = []
-    for item in data:
-        p = item.get('period')
-        if p is None:
-            continue
-        labels.append(p.strftime('%Y-%m-%d'))
-        totals.append(float(item.get('total') or 0))
+    for period, total in _period_totals(start, end, granularity):
+        labels.append(period.strftime('%Y-%m-%d'))
+        totals.append(float(total))
 
     # data accuracy verification (sum check)
     grand_total = sum(totals)
@@ -378,36 +546,39 @@ def reports_data(request):
 
 
 @login_required
-def reports_export(request):
-    # export CSV (Excel-compatible) for a given date range and granularity
+def reports_products(request):
+    # per-product performance and margin analytics in JSON
     start = request.GET.get('start_date')
     end = request.GET.get('end_date')
-    granularity = request.GET.get('granularity', 'daily')
-
-    # reuse reports_data logic by assembling queryset
-    qs = Sales.objects.all()
+    start_date = end_date = None
     if start:
         try:
-            start_dt = datetime.datetime.strptime(start, '%Y-%m-%d')
-            qs = qs.filter(date_added__date__gte=start_dt.date())
+            start_date = datetime.datetime.strptime(start, '%Y-%m-%d').date()
         except Exception:
             pass
     if end:
         try:
-            end_dt = datetime.datetime.strptime(end, '%Y-%m-%d')
-            qs = qs.filter(date_added__date__lte=end_dt.date())
+            end_date = datetime.datetime.strptime(end, '%Y-%m-%d').date()
         except Exception:
             pass
+    return JsonResponse(product_performance(start_date, end_date))
 
-    if granularity == 'weekly':
-        data = qs.annotate(period=TruncWeek('date_added')).values('period').annotate(total=Sum('total_amount')).order_by('period')
-        period_label = 'Week'
-    elif granularity == 'monthly':
-        data = qs.annotate(period=TruncMonth('date_added')).values('period').annotate(total=Sum('total_amount')).order_by('period')
-        period_label = 'Month'
-    else:
-        data = qs.annotate(period=TruncDay('date_added')).values('period').annotate(total=Sum('total_amount')).order_by('period')
-        period_label = 'Date'
+
+@login_required
+def reports_export(request):
+    # export CSV (Excel-compatible) or PDF for a given date range and granularity
+    start = request.GET.get('start_date')
+    end = request.GET.get('end_date')
+    granularity = request.GET.get('granularity', 'daily')
+
+    period_label = {'weekly': 'Week', 'monthly': 'Month'}.get(granularity, 'Date')
+    rows = [(period.strftime('%Y-%m-%d'), float(total)) for period, total in _period_totals(start, end, granularity)]
+    filename = f"sales_report_{granularity}_{start or 'all'}_{end or 'all'}"
+
+    if request.GET.get('format') == 'pdf':
+        resp = HttpResponse(_sales_report_pdf(rows, period_label, start, end), content_type='application/pdf')
+        resp['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
+        return resp
 
     import csv
     from io import StringIO
@@ -415,17 +586,58 @@ def reports_export(request):
     buf = StringIO()
     writer = csv.writer(buf)
     writer.writerow([period_label, 'Total Sales'])
-    for item in data:
-        p = item.get('period')
-        if p is None:
-            continue
-        writer.writerow([p.strftime('%Y-%m-%d'), float(item.get('total') or 0)])
+    writer.writerows(rows)
 
     resp = HttpResponse(buf.getvalue(), content_type='text/csv')
-    filename = f"sales_report_{granularity}_{start or 'all'}_{end or 'all'}.csv"
-    resp['Content-Disposition'] = f'attachment; filename="{filename}"'
+    resp['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
     return resp
 
+def _sales_report_pdf(rows, period_label, start, end):
+    # rendered server-side so the reports page needs no client-side PDF libraries
+    from io import BytesIO
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=landscape(A4), leftMargin=15 * mm, rightMargin=15 * mm)
+    styles = getSampleStyleSheet()
+    grand_total = sum(total for _, total in rows)
+    story = [
+        Paragraph('Sales Report', styles['Title']),
+        Paragraph(f"{start or 'Beginning'} to {end or 'today'} &mdash; Total: Rs. {grand_total:.2f}", styles['Normal']),
+        Spacer(1, 6 * mm),
+    ]
+
+    if rows:
+        drawing = Drawing(doc.width, 70 * mm)
+        chart = VerticalBarChart()
+        chart.x, chart.y = 15 * mm, 10 * mm
+        chart.width, chart.height = doc.width - 20 * mm, 55 * mm
+        chart.data = [[total for _, total in rows]]
+        chart.categoryAxis.categoryNames = [label for label, _ in rows]
+        chart.categoryAxis.labels.angle = 45 if len(rows) > 12 else 0
+        chart.categoryAxis.labels.boxAnchor = 'ne' if len(rows) > 12 else 'n'
+        chart.categoryAxis.labels.fontSize = 6
+        chart.valueAxis.valueMin = 0
+        chart.bars[0].fillColor = colors.Color(54 / 255, 162 / 255, 235 / 255)
+        drawing.add(chart)
+        story += [drawing, Spacer(1, 6 * mm)]
+
+    table = Table([[period_label, 'Total Sales']] + [[label, f'{total:.2f}'] for label, total in rows], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ]))
+    story.append(table)
+    doc.build(story)
+    return buf.getvalue()
+
 def logout_user(request):
     logout(request)
     return redirect('login')
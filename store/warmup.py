@@ -0,0 +1,48 @@
+import logging
+import time
+
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import reverse
+
+from .catalog import cached_categories
+from .events import dashboard_broker
+from .stock import prime_total_stock
+
+logger = logging.getLogger(__name__)
+
+# Templates rendered on the hot paths, compiled into the cached loader up front
+WARM_TEMPLATES = [
+    'base.html',
+    'login.html',
+    'dashboard.html',
+    'dashboard_recent_sales.html',
+    'store/billing.html',
+    'store/sales_list.html',
+    'store/invoice.html',
+    'store/product_list.html',
+    'store/reports.html',
+    'sw.js',
+]
+
+
+def warm_up():
+    """Do the lazy first-request work before a worker accepts traffic.
+
+    Builds the URL resolver, compiles the templates and fills the stock,
+    category and dashboard caches. With gunicorn's preload_app this
+    runs once in the master and the forked workers inherit the result.
+    Returns the elapsed time in seconds.
+    """
+    started = time.perf_counter()
+    reverse('dashboard')
+    for name in WARM_TEMPLATES:
+        get_template(name)
+    products = prime_total_stock()
+    cached_categories()
+    dashboard_broker.prime()
+    # forked workers must not share the master's database connection
+    connections.close_all()
+    elapsed = time.perf_counter() - started
+    logger.info('Warm-up done in %.3fs (stock cached for %d products)', elapsed, products)
+    return elapsed
@@ -0,0 +1,59 @@
+// Service worker for the billing page: precaches the page shell and its
+// fingerprinted static assets so the till opens instantly and offline.
+const CACHE_NAME = 'billing-shell-{{ version }}';
+const BILLING_URL = '{% url "billing" %}';
+const PRECACHE_URLS = {{ precache_urls|safe }};
+const STATIC_URL = '{{ static_url }}';
+
+self.addEventListener('install', function (event) {
+    event.waitUntil(
+        caches.open(CACHE_NAME).then(function (cache) { return cache.addAll(PRECACHE_URLS); })
+            .then(function () { return self.skipWaiting(); })
+    );
+});
+
+self.addEventListener('activate', function (event) {
+    event.waitUntil(
+        caches.keys().then(function (keys) {
+            return Promise.all(keys.filter(function (k) {
+                return k.startsWith('billing-shell-') && k !== CACHE_NAME;
+            }).map(function (k) { return caches.delete(k); }));
+        }).then(function () { return self.clients.claim(); })
+    );
+});
+
+self.addEventListener('fetch', function (event) {
+    const req = event.request;
+    if (req.method !== 'GET') return;
+    const url = new URL(req.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (url.pathname === BILLING_URL) {
+        // network first so prices and the CSRF token stay fresh; cached shell when offline
+        event.respondWith(
+            fetch(req).then(function (resp) {
+                if (resp.ok && !resp.redirected) {
+                    const copy = resp.clone();
+                    caches.open(CACHE_NAME).then(function (cache) { cache.put(BILLING_URL, copy); });
+                }
+                return resp;
+            }).catch(function () { return caches.match(BILLING_URL); })
+        );
+        return;
+    }
+
+    if (url.pathname.startsWith(STATIC_URL)) {
+        // static files are fingerprinted, so a cached copy never goes stale
+        event.respondWith(
+            caches.match(req).then(function (cached) {
+                return cached || fetch(req).then(function (resp) {
+                    if (resp.ok) {
+                        const copy = resp.clone();
+                        caches.open(CACHE_NAME).then(function (cache) { cache.put(req, copy); });
+                    }
+                    return resp;
+                });
+            })
+        );
+    }
+});